@@ -5,7 +5,10 @@ Updated for NEW 2025 Foursquare Places API + Rate Limit Protection
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from geocache import cached_geocode
 
 load_dotenv()
 
@@ -13,10 +16,19 @@ FSQ_SERVICE_KEY = os.getenv("FSQ_SERVICE_KEY")
 LOCATIONIQ_KEY = os.getenv("LOCATIONIQ_KEY")
 FSQ_VERSION = "2025-06-17"  # required version header
 
+# Shared pooled session: keeps TCP/TLS connections alive across helper calls
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=25,
+    pool_maxsize=25,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
 
 # ----------------------------------------------------
-# LocationIQ Geocoding
+# LocationIQ Geocoding (cached in memory + on disk)
 # ----------------------------------------------------
+@cached_geocode
 def geocode_address(address):
     if not LOCATIONIQ_KEY:
         print("LocationIQ key missing!")
@@ -31,7 +43,7 @@ def geocode_address(address):
     }
 
     try:
-        r = requests.get(url, params=params, timeout=6)
+        r = SESSION.get(url, params=params, timeout=6)
         r.raise_for_status()
         data = r.json()
         if not data:
@@ -68,7 +80,7 @@ def fsq_search_places(lat, lon, radius=8000, limit=10):
     }
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = SESSION.get(url, headers=headers, params=params, timeout=10)
         resp.raise_for_status()
         return resp.json().get("results", [])
     except requests.exceptions.HTTPError as e:
@@ -114,7 +126,7 @@ def fsq_get_photo_url(fsq_place_id):
     }
 
     try:
-        r = requests.get(url, headers=headers, timeout=6)
+        r = SESSION.get(url, headers=headers, timeout=6)
         if r.status_code != 200:
             return None
 
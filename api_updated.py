@@ -6,11 +6,28 @@ Flask wrapper for WeekendWish:
 - enables CORS and serves the demo UI at '/'
 """
 
+# Optional cooperative I/O: if gevent is installed, patch sockets/threads
+# before requests & ssl are imported so the blocking geocode/FSQ/photo
+# calls yield to other requests (run with: gunicorn -k gevent api_updated:app)
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    GEVENT = True
+except ImportError:
+    GEVENT = False
+
 import os
-from math import log1p
-from flask import Flask, request, jsonify, send_from_directory
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import the helper functions from your existing code
 # Your repo already has functions: geocode_address, fsq_search_places, safe_get_main_coords, fsq_get_photo_url
 # They are defined in api.py and extras.py — we import them here (adjust imports if you put them elsewhere)
@@ -21,9 +38,23 @@ except Exception:
     # fallback to extras
     from extras import geocode_address, fsq_search_places, safe_get_main_coords, fsq_get_photo_url
 
+_LATLNG = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
 app = Flask(__name__, static_folder="static")
 CORS(app)
 
+
+def _json(obj, status=200):
+    # orjson is much faster than stdlib json on dict-of-lists payloads
+    if orjson is None:
+        return jsonify(obj), status
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json"
+    )
+
+
 @app.route("/", methods=["GET"])
 def serve_ui():
     # Serve demo page that lives in templates/nearby.html
@@ -47,33 +78,29 @@ def recommend_places():
     data = request.get_json() or {}
     try:
         budget = float(data.get("budget", 0) or 0)
-    except:
+    except (TypeError, ValueError):
         budget = 0.0
     try:
         people = int(data.get("people", 1) or 1)
-    except:
+    except (TypeError, ValueError):
         people = 1
 
     start = data.get("start")
     radius = int(data.get("radius", 8000))
 
     if not start:
-        return jsonify({"error": "starting location missing"}), 400
+        return _json({"error": "starting location missing"}, 400)
 
     # Parse "lat,lng" if provided
     lat = lon = None
-    if isinstance(start, str) and "," in start:
-        parts = [s.strip() for s in start.split(",")]
-        if len(parts) >= 2:
-            try:
-                lat = float(parts[0]); lon = float(parts[1])
-            except Exception:
-                lat = lon = None
+    m = _LATLNG.match(start) if isinstance(start, str) else None
+    if m:
+        lat, lon = float(m.group(1)), float(m.group(2))
 
     if lat is None or lon is None:
         lat, lon = geocode_address(start)
     if lat is None or lon is None:
-        return jsonify({"error": "Could not geocode starting location"}), 400
+        return _json({"error": "Could not geocode starting location"}, 400)
 
     # Call Foursquare search (or your configured search function)
     raw_places = []
@@ -81,7 +108,7 @@ def recommend_places():
         raw_places = fsq_search_places(lat, lon, radius=radius, limit=40)
     except Exception as e:
         # Return a helpful error while keeping endpoint alive
-        return jsonify({"error": "Foursquare search failed", "details": str(e)}), 500
+        return _json({"error": "Foursquare search failed", "details": str(e)}, 500)
 
     budget_per_person = budget / max(1, people)
 
@@ -98,51 +125,50 @@ def recommend_places():
 
     max_price_lvl = allowed_price_level(budget_per_person)
 
-    cleaned = []
-    for p in raw_places:
-        pid = p.get("fsq_place_id") or p.get("fsq_id") or p.get("fsqId") or p.get("id")
-        name = p.get("name")
-        price = p.get("price")  # FSQ returns price or None
-        popularity = p.get("popularity") or 0
-        lat2, lon2 = safe_get_main_coords(p)
+    # Budget filter + popularity score as array ops over all places at once
+    pops = np.array([float(p.get("popularity") or 0) for p in raw_places], dtype=np.float64)
+    prices = np.array([
+        p.get("price") if isinstance(p.get("price"), (int, float)) else np.nan
+        for p in raw_places
+    ], dtype=np.float64)
+    scores = pops * np.log1p(pops)
+    keep = np.flatnonzero(~(prices > max_price_lvl))  # NaN (no price) is kept
+
+    # Sort and keep top 12 (stable, so ties keep FSQ order)
+    top_idx = keep[np.argsort(-scores[keep], kind="stable")][:12]
+
+    top = []
+    for i in top_idx:
+        p = raw_places[i]
         location = p.get("location") or {}
-
-        # Budget filter (if price present)
-        if (price is not None) and (isinstance(price, (int, float)) and price > max_price_lvl):
-            continue
-
-        # Popularity-based score
-        try:
-            score = float(popularity) * log1p(float(popularity or 0))
-        except Exception:
-            score = float(popularity or 0)
-
-        cleaned.append({
-            "id": pid,
-            "name": name,
-            "price": price,
-            "popularity": popularity,
-            "score": score,
+        lat2, lon2 = safe_get_main_coords(p)
+        top.append({
+            "id": p.get("fsq_place_id") or p.get("fsq_id") or p.get("fsqId") or p.get("id"),
+            "name": p.get("name"),
+            "price": p.get("price"),  # FSQ returns price or None
+            "popularity": p.get("popularity") or 0,
+            "score": float(scores[i]),
             "lat": lat2,
             "lon": lon2,
             "address": location.get("formatted_address") or location.get("address") or location.get("locality")
         })
 
-    # Sort and keep top 12
-    cleaned.sort(key=lambda x: x.get("score", 0), reverse=True)
-    top = cleaned[:12]
-
-    # attach photos (best-effort)
-    for item in top:
+    # attach photos (best-effort), fetched concurrently
+    def photo_for(pid):
+        if not pid:
+            return None
         try:
-            if item.get("id"):
-                item["photo"] = fsq_get_photo_url(item["id"])
-            else:
-                item["photo"] = None
+            return fsq_get_photo_url(pid)
         except Exception:
-            item["photo"] = None
+            return None
+
+    if top:
+        with ThreadPoolExecutor(max_workers=len(top)) as ex:
+            photos = list(ex.map(photo_for, [item.get("id") for item in top]))
+        for item, photo in zip(top, photos):
+            item["photo"] = photo
 
-    return jsonify({
+    return _json({
         "start_coords": {"lat": lat, "lon": lon},
         "budget_per_person": budget_per_person,
         "results": top
@@ -152,4 +178,8 @@ def recommend_places():
 if __name__ == "__main__":
     # Running as script: start Flask dev server
     # Note: dev server is fine for testing locally
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    if GEVENT:
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(("0.0.0.0", 5000), app).serve_forever()
+    else:
+        app.run(host="0.0.0.0", port=5000, debug=True)
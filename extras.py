@@ -1,25 +1,52 @@
 import os
+import math
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from geopy.distance import geodesic
+from geocache import cached_geocode
 
 load_dotenv()
 FSQ_API_KEY = os.getenv("FSQ_API_KEY")
 
-# 1) Geocode via Nominatim (free)
+# Shared pooled session reused by all helpers below
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=25,
+    pool_maxsize=25,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
+# 1) Geocode via Nominatim (free), cached in memory + on disk
+@cached_geocode
 def geocode_address(address):
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": f"{address}, Pune, India", "format": "json", "limit": 1}
-    r = requests.get(url, params=params, headers={"User-Agent":"WeekendWish/1.0"})
+    r = SESSION.get(url, params=params, headers={"User-Agent":"WeekendWish/1.0"})
     r.raise_for_status()
     data = r.json()
     if not data:
         return None, None
     return float(data[0]["lat"]), float(data[0]["lon"])
 
-# 2) Distance and travel-time approx (haversine via geopy)
-def distance_km(lat1, lon1, lat2, lon2):
-    return geodesic((lat1, lon1), (lat2, lon2)).km
+# 2) Distance and travel-time approx
+# Haversine (spherical earth) is within ~0.5% of the ellipsoidal geodesic,
+# far below what a city-scale planner needs, and avoids geopy's iterative
+# solver; pass precise=True to get the geodesic value anyway.
+EARTH_RADIUS_M = 6371000.0
+
+def _hav_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def distance_km(lat1, lon1, lat2, lon2, precise=False):
+    if precise:
+        return geodesic((lat1, lon1), (lat2, lon2)).km
+    return _hav_m(lat1, lon1, lat2, lon2) / 1000.0
 
 def travel_time_min(lat1, lon1, lat2, lon2, avg_speed_kmph=20):
     dist = distance_km(lat1, lon1, lat2, lon2)
@@ -39,7 +66,7 @@ def fsq_search_places(lat, lon, radius=8000, limit=30, categories=None):
     }
     if categories:
         params["categories"] = categories
-    resp = requests.get(url, headers=headers, params=params)
+    resp = SESSION.get(url, headers=headers, params=params)
     resp.raise_for_status()
     return resp.json().get("results", [])
 
@@ -47,7 +74,7 @@ def fsq_search_places(lat, lon, radius=8000, limit=30, categories=None):
 def fsq_get_photo_url(fsq_id):
     url = f"https://api.foursquare.com/v3/places/{fsq_id}/photos"
     headers = {"Authorization": FSQ_API_KEY}
-    resp = requests.get(url, headers=headers)
+    resp = SESSION.get(url, headers=headers)
     if resp.status_code != 200:
         return None
     photos = resp.json()
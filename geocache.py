@@ -0,0 +1,73 @@
+"""
+geocache.py
+In-process (lru_cache) + on-disk (shelve) cache for geocoding lookups
+"""
+
+import time
+import shelve
+import threading
+import functools
+
+CACHE_PATH = "geocode_cache.db"
+TTL_SECONDS = 30 * 24 * 3600  # re-geocode an address after 30 days
+
+_lock = threading.Lock()
+# Striped per-address locks: concurrent requests for the same address wait
+# for the first lookup instead of each hitting the geocoding API
+_key_locks = [threading.Lock() for _ in range(64)]
+
+
+class _Miss(Exception):
+    """Raised inside the lru layer so failed lookups are not memoized."""
+
+
+def normalize_address(address):
+    return " ".join(str(address).lower().split())
+
+
+def _disk_get(key):
+    with _lock:
+        try:
+            with shelve.open(CACHE_PATH) as db:
+                hit = db.get(key)
+        except Exception:
+            return None
+    if hit and time.time() - hit[2] < TTL_SECONDS:
+        return hit[0], hit[1]
+    return None
+
+
+def _disk_put(key, lat, lon):
+    with _lock:
+        try:
+            with shelve.open(CACHE_PATH) as db:
+                db[key] = (lat, lon, time.time())
+        except Exception as e:
+            print("Geocode cache write failed:", e)
+
+
+def cached_geocode(fn):
+    """Wrap a geocode(address) -> (lat, lon) function with both cache layers."""
+
+    @functools.lru_cache(maxsize=4096)
+    def lookup(key):
+        hit = _disk_get(key)
+        if hit:
+            return hit
+        lat, lon = fn(key)
+        if lat is None or lon is None:
+            raise _Miss(key)
+        _disk_put(key, lat, lon)
+        return lat, lon
+
+    @functools.wraps(fn)
+    def wrapper(address):
+        key = normalize_address(address)
+        try:
+            with _key_locks[hash(key) % len(_key_locks)]:
+                return lookup(key)
+        except _Miss:
+            return None, None
+
+    wrapper.cache_clear = lookup.cache_clear
+    return wrapper
@@ -0,0 +1,42 @@
+"""
+route.py
+Greedy nearest-neighbour tour over a (N, 2) coordinate array
+(JIT-compiled with Numba when it is installed)
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def greedy_tsp(coords, cx, cy):
+    """Visit order (int32 indices) starting from (cx, cy), squared euclidean metric."""
+    n = coords.shape[0]
+    visited = np.zeros(n, np.bool_)
+    order = np.empty(n, np.int32)
+
+    for k in range(n):
+        best = -1
+        best_d = 1e30
+        for i in range(n):
+            if visited[i]:
+                continue
+            dx = coords[i, 0] - cx
+            dy = coords[i, 1] - cy
+            d = dx * dx + dy * dy
+            if d < best_d:
+                best_d = d
+                best = i
+        visited[best] = True
+        order[k] = best
+        cx = coords[best, 0]
+        cy = coords[best, 1]
+
+    return order
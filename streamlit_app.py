@@ -8,12 +8,16 @@ Logic otherwise unchanged
 # ============================================================
 # 1. Imports
 # ============================================================
+import os
+import re
 import math
 import html as html_lib
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import streamlit as st
-import streamlit.components.v1 as components
-from geopy.distance import geodesic
+from sklearn.neighbors import BallTree
+from route import greedy_tsp
 
 # ============================================================
 # 2. Optional Online Helpers
@@ -36,6 +40,8 @@ except Exception:
 # 3. Config
 # ============================================================
 CSV_PATH = "pune_processed.csv"
+# The only CSV columns the app reads (the file has ~300 OSM tag columns)
+CSV_COLUMNS = ("name", "address", "lat", "lon", "popularity", "category", "tags", "amenity")
 st.set_page_config(page_title="WeekendWish — Itinerary", layout="wide")
 
 # ============================================================
@@ -58,6 +64,18 @@ html, body, [class*="css"] {
     margin-right: 8px;
 }
 
+.place-grid {
+    display: grid;
+    gap: 16px;
+}
+
+.place-card {
+    background: #ffffff;
+    border-radius: 16px;
+    padding: 16px;
+    box-shadow: 0 8px 22px rgba(0,0,0,0.08);
+}
+
 .flow-step {
     display: flex;
     align-items: center;
@@ -83,6 +101,40 @@ html, body, [class*="css"] {
 </style>
 """, unsafe_allow_html=True)
 
+# HTML templates are kept flat (no indentation / blank lines) so that
+# markdown treats each rendered block as raw HTML, not a code block
+CARD_TEMPLATE = (
+    '<div class="place-card">'
+    '<div style="font-weight:700">{name}</div>'
+    '<div style="margin-top:8px">'
+    '<span class="badge">⭐ {popularity:.1f}</span>'
+    '<span class="badge">📍 {distance_km:.2f} km</span>'
+    '</div>'
+    '<details style="margin-top:8px;font-size:13px;color:#374151">'
+    '<summary>Details</summary>'
+    '<div>{address}</div>'
+    '<div>{lat:.5f}, {lon:.5f}</div>'
+    '</details>'
+    '<div style="margin-top:12px">'
+    '<a href="https://www.google.com/maps/search/?api=1&query={name}" '
+    'target="_blank" style="font-weight:600;color:#4f46e5;text-decoration:none">'
+    '🗺 Open in Google Maps</a>'
+    '</div>'
+    '</div>'
+)
+
+FLOW_TEMPLATE = (
+    '<div class="flow-step">'
+    '<div class="flow-circle">{step}</div>'
+    '<div>'
+    '<div style="font-weight:700">{name}</div>'
+    '<div style="font-size:13px;color:#374151">'
+    '⭐ {popularity:.1f} • 📍 {distance_km:.2f} km'
+    '</div>'
+    '</div>'
+    '</div>'
+)
+
 # ============================================================
 # 5. Title
 # ============================================================
@@ -133,65 +185,117 @@ itinerary_btn = st.button("Generate Itinerary (Groq)")
 # ============================================================
 # 7. Helpers
 # ============================================================
+_LATLNG = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+@lru_cache(maxsize=32)
 def parse_latlng(text):
-    if "," in text:
-        try:
-            a, b = text.split(",", 1)
-            return float(a.strip()), float(b.strip())
-        except:
-            return None, None
+    m = _LATLNG.match(text)
+    if m:
+        return float(m.group(1)), float(m.group(2))
     return None, None
 
-def popularity_score(p):
-    try:
-        return float(p) * math.log1p(float(p))
-    except:
-        return 0.0
+MATCH_COLUMNS = ("name", "category", "tags", "amenity")
 
-def match_category_offline(row, selected_category):
-    if not selected_category or selected_category == "any":
-        return True
+def build_match_text(df):
+    """Lowercased name/category/tags/amenity, joined once per CSV load."""
+    text = pd.Series("", index=df.index, dtype="string")
+    for col in MATCH_COLUMNS:
+        if col in df.columns:
+            text = text + " " + df[col].astype("string").fillna("")
+    return text.str.lower()
 
-    text = " ".join([
-        str(row.get("name", "")),
-        str(row.get("category", "")),
-        str(row.get("tags", "")),
-        str(row.get("amenity", ""))
-    ]).lower()
+def match_category_offline(df, selected_category):
+    """Boolean mask of rows whose precomputed match text mentions the category."""
+    if not selected_category or selected_category == "any":
+        return pd.Series(True, index=df.index)
 
-    return selected_category.lower() in text
+    return df["_match_text"].str.contains(
+        selected_category.lower(), na=False, regex=False
+    )
 
 # ============================================================
 # 8. Search (FIXED)
 # ============================================================
-def search_offline(lat0, lon0, radius_m):
-    df = pd.read_csv(CSV_PATH)
-
-    df["distance_m"] = df.apply(
-        lambda r: geodesic((lat0, lon0), (r["lat"], r["lon"])).meters,
-        axis=1
+@st.cache_data(show_spinner=False)
+def load_places(path, mtime):
+    # mtime is only part of the cache key, so edits to the CSV invalidate it
+    # Arrow-backed columns: contiguous string buffers, faster str ops.
+    # Only parse the columns we use; lat/lon stay float64 for the BallTree.
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(
+        path,
+        engine="pyarrow",
+        dtype_backend="pyarrow",
+        usecols=[c for c in CSV_COLUMNS if c in header],
+        dtype={"popularity": "float32[pyarrow]"}
     )
-
-    df = df[df["distance_m"] <= radius_m]
+    df = df.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    df["_match_text"] = build_match_text(df)
+    lat_rad = np.radians(df["lat"].to_numpy(dtype=np.float64))
+    lon_rad = np.radians(df["lon"].to_numpy(dtype=np.float64))
+    return df, lat_rad, lon_rad
+
+@st.cache_resource(show_spinner=False)
+def load_places_index(path, mtime):
+    # Built once per CSV version; the frame is shared, so callers must not mutate it
+    df, lat_rad, lon_rad = load_places(path, mtime)
+    return df, BallTree(np.column_stack([lat_rad, lon_rad]), metric="haversine")
+
+def search_offline(lat0, lon0, radius_m, category_selected):
+    df, tree = load_places_index(CSV_PATH, os.path.getmtime(CSV_PATH))
+
+    # O(log N) radius query on the haversine BallTree instead of a full scan
+    ind, dist = tree.query_radius(
+        [[math.radians(lat0), math.radians(lon0)]],
+        r=radius_m / 6371000.0,
+        return_distance=True
+    )
+    order = np.argsort(ind[0])  # keep CSV row order for stable tie-breaking
+    df = df.iloc[ind[0][order]].assign(distance_m=dist[0][order] * 6371000.0)
 
     # ✅ CATEGORY FILTER (FIX)
-    df = df[df.apply(lambda r: match_category_offline(r, category), axis=1)]
-
-    df["score"] = df.get("popularity", 0).fillna(0).apply(popularity_score)
-    df = df.sort_values("score", ascending=False)
+    df = df[match_category_offline(df, category_selected)]
 
-    results = []
-    for _, r in df.iterrows():
-        results.append({
-            "name": r.get("name"),
-            "address": r.get("address", ""),
-            "popularity": r.get("popularity", 0),
-            "lat": r["lat"],
-            "lon": r["lon"],
-            "distance_m": r["distance_m"]
-        })
+    if "popularity" in df.columns:
+        p = pd.to_numeric(df["popularity"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    else:
+        p = np.zeros(len(df))
+
+    cols = ["name", "address", "lat", "lon", "distance_m"]
+    out = df.reindex(columns=cols)
+    if "address" not in df.columns:
+        out["address"] = ""
+
+    names = out["name"].fillna("").to_numpy(dtype=object)
+    addresses = out["address"].fillna("").to_numpy(dtype=object)
+
+    # Structure-of-arrays result: one NumPy array per field. Rows stay in CSV
+    # order; search_sorted does the only sort. HTML-escaped copies are made
+    # here once so reruns only format strings.
+    return {
+        "name": names,
+        "address": addresses,
+        "name_esc": np.array([html_lib.escape(str(n)) for n in names], dtype=object),
+        "address_esc": np.array([html_lib.escape(str(a or "—")) for a in addresses], dtype=object),
+        "popularity": p.astype(np.float32),
+        "score": p * np.log1p(p),
+        "lat": out["lat"].to_numpy(dtype=np.float32),
+        "lon": out["lon"].to_numpy(dtype=np.float32),
+        "distance_m": out["distance_m"].to_numpy(dtype=np.float32),
+    }
+
+@st.cache_data(ttl=600, show_spinner=False)
+def search_sorted(lat0, lon0, radius_m, category_selected, sort_key):
+    # Pure function of its (hashable) inputs, so layout-only widget changes
+    # and repeated clicks are served from cache
+    soa = search_offline(lat0, lon0, radius_m, category_selected)
+
+    if sort_key == "distance":
+        order = np.argsort(soa["distance_m"], kind="stable")
+    else:
+        order = np.argsort(-soa["score"], kind="stable")
 
-    return results
+    return {k: v[order] for k, v in soa.items()}
 
 def perform_search():
     lat0, lon0 = parse_latlng(start_location)
@@ -199,34 +303,29 @@ def perform_search():
     if (lat0 is None or lon0 is None) and geocode_address:
         lat0, lon0 = geocode_address(start_location)
 
-    results = search_offline(lat0, lon0, radius)
-
-    if sort_by == "distance":
-        results = sorted(results, key=lambda x: x["distance_m"])
-    else:
-        results = sorted(results, key=lambda x: x.get("popularity", 0), reverse=True)
-
-    st.session_state["results"] = results
+    # ~11 m quantization so near-identical start points share a cache entry
+    soa = search_sorted(
+        round(lat0, 4), round(lon0, 4), radius, category, sort_by
+    )
+    st.session_state["results_soa"] = soa
+    # Built once per search; reruns from unrelated widgets reuse it
+    st.session_state["_map_df"] = pd.DataFrame({"lat": soa["lat"], "lon": soa["lon"]})
     st.session_state["start_coords"] = (lat0, lon0)
 
+def has_results():
+    soa = st.session_state.get("results_soa")
+    return soa is not None and len(soa["name"]) > 0
+
 # ============================================================
 # 9. Route Ordering
 # ============================================================
-def order_route(pois, lat0, lon0):
-    remaining = pois.copy()
-    ordered = []
-    current = (lat0, lon0)
-
-    while remaining:
-        nearest = min(
-            remaining,
-            key=lambda p: geodesic(current, (p["lat"], p["lon"])).meters
-        )
-        ordered.append(nearest)
-        current = (nearest["lat"], nearest["lon"])
-        remaining.remove(nearest)
-
-    return ordered
+def order_route(lats, lons, lat0, lon0):
+    """Visit order (indices) of a greedy nearest-neighbour tour from the start."""
+    # Local equirectangular projection around the start: plain euclidean
+    # distance ranks stops the same as geodesic at city scale, without trig
+    cos_lat0 = math.cos(math.radians(lat0))
+    xy = np.column_stack([lats, lons * cos_lat0]).astype(np.float64)
+    return greedy_tsp(xy, float(lat0), float(lon0) * cos_lat0)
 
 # ============================================================
 # 10. Actions
@@ -235,84 +334,65 @@ if search_btn:
     perform_search()
 
 if itinerary_btn:
-    if not st.session_state.get("results"):
+    if not has_results():
         perform_search()
 
+    soa = st.session_state["results_soa"]
     ordered = order_route(
-        st.session_state["results"][:6],
+        soa["lat"][:6], soa["lon"][:6],
         *st.session_state["start_coords"]
     )
+    dist_km = soa["distance_m"][ordered] / 1000
 
     st.subheader("🧭 Optimized Route")
 
-    route_df = pd.DataFrame([
-        {
-            "Step": i + 1,
-            "Place": p["name"],
-            "Distance (km)": round(p["distance_m"] / 1000, 2),
-            "Travel time (min)": int((p["distance_m"] / 1000) / 20 * 60),
-            "Suggested stay": "60–90 mins"
-        }
-        for i, p in enumerate(ordered)
-    ])
+    route_df = pd.DataFrame({
+        "Step": np.arange(1, len(ordered) + 1),
+        "Place": soa["name"][ordered],
+        "Distance (km)": np.round(dist_km, 2),
+        "Travel time (min)": (dist_km / 20 * 60).astype(int),
+        "Suggested stay": "60–90 mins"
+    })
 
     st.dataframe(route_df, use_container_width=True, hide_index=True)
 
     st.subheader("🗓 Your Day Flow")
 
-    for i, p in enumerate(ordered, start=1):
-        st.markdown(f"""
-        <div class="flow-step">
-            <div class="flow-circle">{i}</div>
-            <div>
-                <div style="font-weight:700">
-                    {html_lib.escape(p["name"])}
-                </div>
-                <div style="font-size:13px;color:#374151">
-                    ⭐ {round(float(p.get("popularity",0)),1)}
-                    • 📍 {p["distance_m"]/1000:.2f} km
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    # Whole day flow in a single markdown call
+    st.markdown("\n".join(
+        FLOW_TEMPLATE.format(
+            step=i,
+            name=soa["name_esc"][j],
+            popularity=soa["popularity"][j],
+            distance_km=soa["distance_m"][j] / 1000
+        )
+        for i, j in enumerate(ordered, start=1)
+    ), unsafe_allow_html=True)
 
 # ============================================================
 # 11. Nearby Places
 # ============================================================
-if st.session_state.get("results"):
+if has_results():
+    soa = st.session_state["results_soa"]
     st.subheader("📍 Nearby Places")
 
-    cols = st.columns(n_columns)
-    for i, r in enumerate(st.session_state["results"]):
-        with cols[i % n_columns]:
-            components.html(f"""
-            <div style="
-                background:#ffffff;
-                border-radius:16px;
-                padding:16px;
-                box-shadow:0 8px 22px rgba(0,0,0,0.08);
-            ">
-                <div style="font-weight:700">
-                    {html_lib.escape(r["name"])}
-                </div>
-
-                <div style="margin-top:8px">
-                    <span class="badge">⭐ {round(float(r.get("popularity",0)),1)}</span>
-                    <span class="badge">📍 {r["distance_m"]/1000:.2f} km</span>
-                </div>
-
-                <div style="margin-top:12px">
-                    <a href="https://www.google.com/maps/search/?api=1&query={html_lib.escape(r['name'])}"
-                       target="_blank"
-                       style="font-weight:600;color:#4f46e5;text-decoration:none">
-                       🗺 Open in Google Maps
-                    </a>
-                </div>
-            </div>
-            """, height=210)
+    # All cards in one CSS-grid HTML blob -> a single markdown call per rerun
+    cards = "\n".join(
+        CARD_TEMPLATE.format(
+            name=soa["name_esc"][i],
+            address=soa["address_esc"][i],
+            popularity=soa["popularity"][i],
+            distance_km=soa["distance_m"][i] / 1000,
+            lat=soa["lat"][i],
+            lon=soa["lon"][i]
+        )
+        for i in range(len(soa["name"]))
+    )
+    st.markdown(
+        f'<div class="place-grid" style="grid-template-columns:repeat({n_columns},minmax(0,1fr))">'
+        f"{cards}</div>",
+        unsafe_allow_html=True
+    )
 
     if show_map:
-        st.map(pd.DataFrame([
-            {"lat": r["lat"], "lon": r["lon"]}
-            for r in st.session_state["results"]
-        ]))
+        st.map(st.session_state["_map_df"])